@@ -0,0 +1,70 @@
+# layout_render.py
+import matplotlib.pyplot as plt
+import matplotlib.patches as patches
+import packing_engine
+
+def create_layout_figure(palette_w, palette_l, final_layout, box_configs, box_label):
+    """Creates a Matplotlib figure visualizing the packed layout."""
+    fig, ax = plt.subplots(1)
+    ax.set_xlim(0, palette_w)
+    ax.set_ylim(0, palette_l)
+    ax.set_aspect('equal', adjustable='box')
+    plt.gca().invert_yaxis()
+    ax.add_patch(patches.Rectangle((0, 0), palette_w, palette_l, fill=False, edgecolor='black', lw=2))
+
+    color_map = {label: box['color'] for label, box in zip(packing_engine.box_labels(box_configs, box_label), box_configs)}
+
+    for rect in final_layout:
+        color = color_map.get(rect['rid'], 'gray')
+        ax.add_patch(patches.Rectangle(
+            (rect['x'], rect['y']), rect['w'], rect['h'],
+            facecolor=color, edgecolor='black', lw=1
+        ))
+        
+        # Add dimension labels on the edges if the box is large enough
+        if rect['w'] > palette_w * 0.05:
+             ax.text(rect['x'] + rect['w']/2, rect['y'] + rect['h'] + 5, f"{rect['w']}",
+                ha='center', va='top', fontsize=7, color='black')
+        
+        if rect['h'] > palette_l * 0.05:
+             ax.text(rect['x'] + rect['w'] + 5, rect['y'] + rect['h']/2, f"{rect['h']}",
+                ha='left', va='center', fontsize=7, color='black', rotation=-90)
+
+    return fig
+
+def generate_layout_description(final_layout, box_configs, algo_name, allow_rotation, t):
+    """Formats the layout data into a human-readable text description."""
+    if not final_layout:
+        return "No layout generated."
+
+    box_stats = {}
+    for i, box in enumerate(box_configs):
+        label = f"{t['box_label']} {chr(65 + i)}"
+        box_stats[label] = {'total': 0, 'S': 0, 'R': 0, 'w': box['w'], 'l': box['l']}
+
+    for rect in final_layout:
+        if rect['rid'] in box_stats:
+            stats = box_stats[rect['rid']]
+            stats['total'] += 1
+            if (rect['w'] == stats['w'] and rect['h'] == stats['l']):
+                stats['S'] += 1
+            else:
+                stats['R'] += 1
+
+    summary = f"- **{t['winning_heuristic']}:** `{algo_name}`\n"
+    summary += f"- **{t['total_boxes']}:** {len(final_layout)}\n\n"
+
+    details = f"**{t['breakdown_header']}:**\n"
+    for label, stats in box_stats.items():
+        if stats['total'] > 0:
+            is_square = stats['w'] == stats['l']
+            if allow_rotation and not is_square:
+                details += f"- **{label}:** {stats['total']} ({t['standard']}: {stats['S']}, {t['rotated']}: {stats['R']})\n"
+            else:
+                details += f"- **{label}:** {stats['total']}\n"
+    
+    details += f"\n**{t['placement_header']}:**\n"
+    for i, rect in enumerate(final_layout):
+        details += f"- **{rect['rid']}:** {t['position']} `({rect['x']:.1f}, {rect['y']:.1f})`, {t['size']} `({rect['w']} x {rect['h']})`\n"
+
+    return summary + details
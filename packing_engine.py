@@ -0,0 +1,525 @@
+# packing_engine.py
+import concurrent.futures
+import hashlib
+import importlib.metadata
+import math
+import random
+import re
+import numpy as np
+import rectpack
+
+import profiling
+
+# Bump whenever a change to the engine can change the layout it returns;
+# the solver fingerprint is derived from it.
+SOLVER_VERSION = "3.7"
+
+# Number of copies queued for a box type with no required quantity.
+UNLIMITED_COPIES = 200
+
+PACK_ALGOS = [rectpack.MaxRectsBl, rectpack.MaxRectsBssf, rectpack.MaxRectsBaf, rectpack.MaxRectsBlsf]
+SORT_ALGOS = [None]
+
+# --- Memory-bounded mode ---
+# Quality trade-off: MaxRects normally keeps every maximal free rectangle, which
+# grows quickly when many small boxes are packed. Capping the list keeps only the
+# largest free rectangles, so a few narrow gaps may be ignored and the result can
+# be slightly worse than an uncapped solve. Tiling fills the pallet one block at a
+# time, starting in a corner, and stops when every queued box is placed; space
+# lost at the seams between tiles is not recovered. The boxes queued are the same
+# as in a normal solve, including UNLIMITED_COPIES for unlimited box types, so
+# the mode only changes how the layout is found, never how many boxes are asked for.
+# Top priority quantities are checked on the whole pallet, not per tile.
+MAX_FREE_RECTS = 64
+TILE_TARGET_BOXES = 150
+
+# --- Load stability ---
+# All metrics are between 0 and 1, higher is better:
+# - interlock: how evenly the boxes are split between the two orientations
+#   (always 0 for square boxes, which look the same either way)
+# - column_stacking: share of boxes lined up in a column with another box of the same width
+# - edge_support: share of the outline of the packed block covered by box sides
+#   (assumes boxes do not overlap, as the packer guarantees; capped at 1)
+# - center_of_gravity: 1 when the centre of mass is in the middle of the block
+STABILITY_METRICS = ['interlock', 'column_stacking', 'edge_support', 'center_of_gravity']
+# 'tie_break' only uses the weighted stability score between layouts with the same
+# box count; 'objective' adds it to the box count, so a layout with one box less
+# only wins when its stability score is more than 1 higher.
+STABILITY_MODES = ['tie_break', 'objective']
+
+
+def box_labels(box_configs, box_label):
+    """Returns the display label for each box type, e.g. 'Box A'."""
+    return [f"{box_label} {chr(65 + i)}" for i in range(len(box_configs))]
+
+
+def required_counts(box_configs, box_label):
+    """Returns the required quantities of the top priority box types and of all box types."""
+    priority_required_counts = {}
+    all_required_counts = {}
+    for box, label in zip(box_configs, box_labels(box_configs, box_label)):
+        if box.get('q'):
+            if box.get('priority'):
+                priority_required_counts[label] = box['q']
+            all_required_counts[label] = box['q']
+    return priority_required_counts, all_required_counts
+
+
+def build_rectangles(box_configs, box_label, unlimited_copies=None):
+    """Builds the rectangle list: priority boxes first, then the rest, each in alphabetical order.
+
+    If unlimited_copies is None, boxes without a quantity are queued
+    UNLIMITED_COPIES times; otherwise it is called with the box config and
+    returns the number of copies to queue.
+    """
+    rectangles_to_pack = []
+    labels = box_labels(box_configs, box_label)
+    ordered = [i for i, box in enumerate(box_configs) if box.get('priority')]
+    ordered += [i for i, box in enumerate(box_configs) if not box.get('priority')]
+
+    for i in ordered:
+        box = box_configs[i]
+        if box.get('q'):
+            copies = box['q']
+        else:
+            copies = UNLIMITED_COPIES if unlimited_copies is None else unlimited_copies(box)
+        for _ in range(copies):
+            rectangles_to_pack.append((box['w'], box['l'], labels[i]))
+
+    return rectangles_to_pack
+
+
+def solver_fingerprint():
+    """Returns a short hash identifying the engine version and every setting that affects its results."""
+    parts = [
+        SOLVER_VERSION,
+        importlib.metadata.version('rectpack'),
+        # Sorted, since the tournament result does not depend on the order of the lists
+        ",".join(sorted(algo.__name__ for algo in PACK_ALGOS)),
+        ",".join(sorted("None" if algo is None else algo.__name__ for algo in SORT_ALGOS)),
+        str(UNLIMITED_COPIES),
+        str(MAX_FREE_RECTS),
+        str(TILE_TARGET_BOXES),
+    ]
+    return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def layout_metrics(placements, box_dims):
+    """Computes the tie-break and stability metrics of a layout in one vectorized pass.
+
+    Besides STABILITY_METRICS, returns the bounding box area, the number of
+    rotated boxes and the distance from the centre of mass to the middle of
+    the bounding box.
+    """
+    if not placements:
+        return {'bbox_area': 0, 'rotated': 0, 'center_offset': 0.0, **{name: 0.0 for name in STABILITY_METRICS}}
+
+    x, y, w, h, base_w, base_h = np.fromiter(
+        ((x, y, w, h) + box_dims[rid] for x, y, w, h, rid in placements), dtype=(float, 6), count=len(placements)
+    ).T
+    n = len(placements)
+    area = w * h
+    min_x, min_y = x.min(), y.min()
+    max_x, max_y = (x + w).max(), (y + h).max()
+    bbox_w, bbox_h = max_x - min_x, max_y - min_y
+
+    rotated = int(((w != base_w) | (h != base_h)).sum())
+
+    center_offset = math.hypot(
+        (area * (x + w / 2)).sum() / area.sum() - (min_x + max_x) / 2,
+        (area * (y + h / 2)).sum() / area.sum() - (min_y + max_y) / 2,
+    )
+
+    _, column_ids, column_sizes = np.unique(np.stack([x, w], axis=1), axis=0, return_inverse=True, return_counts=True)
+    column_stacking = (column_sizes[column_ids.reshape(-1)] > 1).mean()
+
+    supported = (
+        h[np.isclose(x, min_x)].sum() + h[np.isclose(x + w, max_x)].sum()
+        + w[np.isclose(y, min_y)].sum() + w[np.isclose(y + h, max_y)].sum()
+    )
+
+    return {
+        'bbox_area': float(bbox_w * bbox_h),
+        'rotated': rotated,
+        'center_offset': center_offset,
+        'interlock': 2 * min(rotated, n - rotated) / n,
+        'column_stacking': float(column_stacking),
+        'edge_support': min(1.0, float(supported / (2 * (bbox_w + bbox_h)))),
+        'center_of_gravity': 1 - center_offset / (math.hypot(bbox_w, bbox_h) / 2),
+    }
+
+
+def stability_score(metrics, stability_weights):
+    """Returns the weighted sum of the stability metrics, 0 if no weights are set."""
+    if not stability_weights:
+        return 0.0
+    return round(sum(weight * metrics[name] for name, weight in stability_weights.items()), 6)
+
+
+def ranking_key(placements, box_dims, rng, stability_weights=None, stability_mode='tie_break'):
+    """Returns the key used to rank candidate layouts (larger is better) and their metrics.
+
+    Layouts are ranked by box count (plus the stability score in 'objective'
+    mode), then by box count alone, then by stability score, then by a smaller bounding box
+    (compactness), fewer rotated boxes and a centre of mass closer to the
+    middle, and finally by a value drawn from rng.
+    """
+    metrics = layout_metrics(placements, box_dims)
+    score = stability_score(metrics, stability_weights)
+    primary = len(placements) + score if stability_mode == 'objective' else len(placements)
+    key = (primary, len(placements), score, -metrics['bbox_area'], -metrics['rotated'], -round(metrics['center_offset'], 6), rng.random())
+    return key, metrics
+
+
+def capped_pack_algo(pack_algo, max_free_rects):
+    """Returns a subclass of pack_algo that keeps at most max_free_rects free rectangles."""
+    if max_free_rects is None:
+        return pack_algo
+
+    def add_rect(self, width, height, rid=None):
+        rect = pack_algo.add_rect(self, width, height, rid)
+        if len(self._max_rects) > max_free_rects:
+            self._max_rects.sort(key=lambda r: r.width * r.height, reverse=True)
+            del self._max_rects[max_free_rects:]
+        return rect
+
+    return type(pack_algo.__name__, (pack_algo,), {'add_rect': add_rect})
+
+
+def run_tournament(rectangles_to_pack, priority_required_counts, palette_w, palette_l, allow_rotation, seed,
+                   max_free_rects=None, stability_weights=None, stability_mode='tie_break'):
+    """Packs the rectangles with every heuristic and keeps the best valid layout.
+
+    Layouts are ranked with ranking_key. Its final tie-break comes from a
+    random generator seeded with the seed and the heuristic's name, so the
+    winner never depends on the order of the heuristics. Only the placements and metrics of the current
+    winner are kept, the placements as a list of (x, y, w, h, rid) tuples;
+    packer objects are discarded after each run.
+    """
+    best_valid_result = {'count': -1, 'placements': None, 'algo': 'None', 'key': None, 'metrics': None}
+    box_dims = {rid: (w, h) for w, h, rid in rectangles_to_pack}
+
+    for pack_algo in PACK_ALGOS:
+        for sort_algo in SORT_ALGOS:
+            packer = rectpack.newPacker(sort_algo=sort_algo, pack_algo=capped_pack_algo(pack_algo, max_free_rects), rotation=allow_rotation)
+            packer.add_bin(palette_w, palette_l)
+            for r in rectangles_to_pack:
+                packer.add_rect(*r)
+            with profiling.stage(f"pack {pack_algo.__name__}"):
+                packer.pack()
+            packed_bin = packer[0] if len(packer) else []
+
+            packed_counts = {label: 0 for label in priority_required_counts.keys()}
+            for rect in packed_bin:
+                if rect.rid in packed_counts:
+                    packed_counts[rect.rid] += 1
+
+            is_valid_layout = all(packed_counts.get(label, 0) >= required for label, required in priority_required_counts.items())
+
+            if not is_valid_layout:
+                continue
+
+            sort_algo_name = "Prioritized List" if sort_algo is None else sort_algo.__name__.replace('SORT_', '')
+            algo_name = f"{pack_algo.__name__} / {sort_algo_name}"
+            placements = [(rect.x, rect.y, rect.width, rect.height, rect.rid) for rect in packed_bin]
+            rng = random.Random(f"{seed}|{algo_name}")
+            current_key, metrics = ranking_key(placements, box_dims, rng, stability_weights, stability_mode)
+            if best_valid_result['key'] is None or current_key > best_valid_result['key']:
+                best_valid_result = {
+                    'count': len(placements),
+                    'algo': algo_name,
+                    'placements': placements,
+                    'key': current_key,
+                    'metrics': metrics,
+                }
+
+    return best_valid_result
+
+
+def choose_tile_grid(box_configs, palette_w, palette_l):
+    """Splits the pallet into nx x ny equal tiles of roughly TILE_TARGET_BOXES boxes each.
+
+    Tiles never get smaller than the longest box side, so every box type still
+    fits in a single tile.
+    """
+    min_area = min(box['w'] * box['l'] for box in box_configs)
+    max_side = max(max(box['w'], box['l']) for box in box_configs)
+    tiles_needed = math.ceil(palette_w * palette_l / min_area / TILE_TARGET_BOXES)
+
+    nx, ny = 1, 1
+    while nx * ny < tiles_needed:
+        # Split the longer tile side, as long as the tile stays big enough
+        if palette_w / nx >= palette_l / ny and palette_w // (nx + 1) >= max_side:
+            nx += 1
+        elif palette_l // (ny + 1) >= max_side:
+            ny += 1
+        elif palette_w // (nx + 1) >= max_side:
+            nx += 1
+        else:
+            break
+    return nx, ny
+
+
+def tile_order(nx, ny):
+    """Returns the (ix, iy) tile positions in fill order, growing a block out from the first corner."""
+    return sorted(((ix, iy) for iy in range(ny) for ix in range(nx)), key=lambda tile: (max(tile), tile[1], tile[0]))
+
+
+def solve_memory_bounded(box_configs, box_label, palette_w, palette_l, allow_rotation, seed,
+                         stability_weights=None, stability_mode='tie_break'):
+    """Fills the pallet tile by tile with a capped free-rectangle list.
+
+    Boxes are queued exactly as in a normal solve (required quantities, or
+    UNLIMITED_COPIES for unlimited types). Each tile takes as many of the
+    remaining boxes as it can, so only the tiles that are needed are used and
+    they form one block. Tiles with the same queue share one solve. The
+    returned metrics are computed over the whole filled block.
+    """
+    nx, ny = choose_tile_grid(box_configs, palette_w, palette_l)
+    tile_w, tile_l = palette_w // nx, palette_l // ny
+    labels = box_labels(box_configs, box_label)
+    priority_required_counts, _ = required_counts(box_configs, box_label)
+    remaining = [box['q'] if box.get('q') else UNLIMITED_COPIES for box in box_configs]
+
+    tile_results = {}
+    placements = []
+    algo = 'None'
+    for ix, iy in tile_order(nx, ny):
+        # Queue no more copies than could possibly fit in the tile
+        queue = tuple(min(left, (tile_w * tile_l) // (box['w'] * box['l'])) for box, left in zip(box_configs, remaining))
+        if not any(queue):
+            break
+        if queue not in tile_results:
+            tile_configs = [dict(box, q=q) for box, q in zip(box_configs, queue)]
+            with profiling.stage("build rectangles"):
+                tile_rects = build_rectangles(tile_configs, box_label, unlimited_copies=lambda box: 0)
+            tile_results[queue] = run_tournament(tile_rects, {}, tile_w, tile_l, allow_rotation, seed,
+                                                 max_free_rects=MAX_FREE_RECTS, stability_weights=stability_weights,
+                                                 stability_mode=stability_mode)
+        tile_result = tile_results[queue]
+        if tile_result['count'] <= 0:
+            break
+        if not placements:
+            algo = tile_result['algo']
+
+        x_offset, y_offset = ix * tile_w, iy * tile_l
+        with profiling.stage("replicate tile"):
+            placements.extend((x + x_offset, y + y_offset, w, h, rid) for x, y, w, h, rid in tile_result['placements'])
+        for i, label in enumerate(labels):
+            remaining[i] -= sum(1 for rect in tile_result['placements'] if rect[4] == label)
+
+    packed_counts = {label: 0 for label in priority_required_counts}
+    for rect in placements:
+        if rect[4] in packed_counts:
+            packed_counts[rect[4]] += 1
+    if any(packed_counts[label] < required for label, required in priority_required_counts.items()):
+        return {'count': -1, 'placements': None, 'algo': 'None', 'metrics': None}
+
+    # Tile metrics only rank candidates inside a tile; report the whole pallet
+    with profiling.stage("layout metrics"):
+        metrics = layout_metrics(placements, {label: (box['w'], box['l']) for label, box in zip(labels, box_configs)})
+
+    return {
+        'count': len(placements),
+        'algo': f"{algo} / Tiled {nx}x{ny}",
+        'placements': placements,
+        'metrics': metrics,
+    }
+
+
+def center_layout(placements, palette_w, palette_l):
+    """Shifts the placements so the packed block sits in the middle of the pallet."""
+    if placements:
+        max_x = max(x + w for x, y, w, h, rid in placements)
+        max_y = max(y + h for x, y, w, h, rid in placements)
+        x_offset = (palette_w - max_x) / 2
+        y_offset = (palette_l - max_y) / 2
+    else:
+        x_offset, y_offset = 0, 0
+
+    return [
+        {'x': x + x_offset, 'y': y + y_offset, 'w': w, 'h': h, 'rid': rid}
+        for x, y, w, h, rid in placements
+    ]
+
+
+def solve(box_configs, box_label, palette_w, palette_l, allow_rotation, memory_bounded=False, seed=0,
+          stability_weights=None, stability_mode='tie_break'):
+    """Runs the heuristic tournament and returns the best valid, centered layout.
+
+    stability_weights maps names from STABILITY_METRICS to weights, see
+    STABILITY_MODES for how they are used. The same inputs, seed and solver
+    fingerprint always give the same layout. The result dict has 'count' (-1
+    if no layout satisfies the top priority quantities), 'algo', 'layout',
+    'metrics', 'required_counts', 'seed' and 'fingerprint'.
+    """
+    priority_required_counts, all_required_counts = required_counts(box_configs, box_label)
+
+    if memory_bounded:
+        best_valid_result = solve_memory_bounded(box_configs, box_label, palette_w, palette_l, allow_rotation, seed,
+                                                 stability_weights, stability_mode)
+    else:
+        with profiling.stage("build rectangles"):
+            rectangles_to_pack = build_rectangles(box_configs, box_label)
+        best_valid_result = run_tournament(rectangles_to_pack, priority_required_counts, palette_w, palette_l, allow_rotation, seed,
+                                           stability_weights=stability_weights, stability_mode=stability_mode)
+
+    layout = []
+    if best_valid_result['count'] != -1:
+        with profiling.stage("center layout"):
+            layout = center_layout(best_valid_result['placements'], palette_w, palette_l)
+
+    return {
+        'count': best_valid_result['count'],
+        'algo': best_valid_result['algo'],
+        'layout': layout,
+        'metrics': best_valid_result['metrics'],
+        'required_counts': all_required_counts,
+        'seed': seed,
+        'fingerprint': solver_fingerprint(),
+    }
+
+
+# --- Pallet-size optimizer ---
+# Upper limit on the number of candidate footprints in one optimizer run
+MAX_FOOTPRINTS = 400
+
+
+def parse_footprints(text):
+    """Parses candidate footprints such as '1200x800, 1140x1140' into (w, l) tuples.
+
+    Entries are separated by commas, semicolons or new lines. Raises ValueError
+    on an entry that is not two positive whole numbers, on an empty list and
+    on more than MAX_FOOTPRINTS entries.
+    """
+    footprints = []
+    for entry in re.split(r"[,;\n]", text):
+        entry = entry.strip()
+        if not entry:
+            continue
+        match = re.fullmatch(r"(\d+)\s*[xX×*]\s*(\d+)", entry)
+        if not match or int(match.group(1)) < 1 or int(match.group(2)) < 1:
+            raise ValueError(f"Invalid pallet footprint: {entry!r}")
+        footprints.append((int(match.group(1)), int(match.group(2))))
+    if not footprints:
+        raise ValueError("No pallet footprints given")
+    if len(footprints) > MAX_FOOTPRINTS:
+        raise ValueError(f"{len(footprints)} pallet footprints given, at most {MAX_FOOTPRINTS} are allowed")
+    return footprints
+
+
+def footprint_range(w_min, w_max, l_min, l_max, step):
+    """Returns every footprint in the given width and length ranges, both ends included.
+
+    Raises ValueError if a minimum is above its maximum, if step is not
+    positive or if the ranges hold more than MAX_FOOTPRINTS footprints.
+    """
+    if w_min > w_max:
+        raise ValueError(f"Minimum width {w_min} is larger than maximum width {w_max}")
+    if l_min > l_max:
+        raise ValueError(f"Minimum length {l_min} is larger than maximum length {l_max}")
+    if step < 1:
+        raise ValueError(f"Step must be at least 1, got {step}")
+    count = ((w_max - w_min) // step + 1) * ((l_max - l_min) // step + 1)
+    if count > MAX_FOOTPRINTS:
+        raise ValueError(f"The ranges give {count} pallet footprints, at most {MAX_FOOTPRINTS} are allowed; use a larger step")
+    return [(w, l) for w in range(w_min, w_max + 1, step) for l in range(l_min, l_max + 1, step)]
+
+
+def bound_items(box_configs):
+    """Returns (area, w, l, copies) per box type, smallest area first, for area_bound."""
+    items = []
+    for box in box_configs:
+        copies = box['q'] if box.get('q') else UNLIMITED_COPIES
+        items.append((box['w'] * box['l'], box['w'], box['l'], copies))
+    return sorted(items)
+
+
+def area_bound(items, palette_w, palette_l, allow_rotation):
+    """Upper bound on the number of boxes that fit on a pallet, from area alone.
+
+    Filling the area with the smallest boxes first gives the most boxes; box
+    types that do not fit on the pallet in any allowed orientation are skipped.
+    """
+    remaining_area = palette_w * palette_l
+    bound = 0
+    for area, w, l, copies in items:
+        fits = (w <= palette_w and l <= palette_l) or (allow_rotation and l <= palette_w and w <= palette_l)
+        if not fits:
+            continue
+        placed = min(copies, remaining_area // area)
+        bound += placed
+        remaining_area -= placed * area
+    return int(bound)
+
+
+def _solve_footprint(job):
+    """Process pool worker: solves one footprint and returns only the numbers the table needs."""
+    box_configs, box_label, palette_w, palette_l, allow_rotation, kwargs = job
+    result = solve(box_configs, box_label, palette_w, palette_l, allow_rotation, **kwargs)
+    placed_area = sum(rect['w'] * rect['h'] for rect in result['layout'])
+    return result['count'], result['algo'], placed_area
+
+
+def optimize_footprint(box_configs, box_label, footprints, allow_rotation, memory_bounded=False, seed=0,
+                       stability_weights=None, stability_mode='tie_break', max_workers=None):
+    """Solves the box mix on every candidate footprint in parallel and ranks them.
+
+    Each footprint is solved in the orientation given, exactly as a normal
+    calculation would. With rotation allowed, W x L and L x W share their
+    area bound. A footprint whose bound is below the best box count found
+    cannot win and is reported as 'pruned'. This is decided after all solves
+    finish, so the table does not depend on scheduling; cancelling queued
+    solves early is only a shortcut. Returns one row per footprint, best
+    first, with 'palette_w', 'palette_l', 'count', 'utilization', 'algo',
+    'bound' and 'status' ('solved', 'no_layout' or 'pruned').
+    """
+    kwargs = {'memory_bounded': memory_bounded, 'seed': seed, 'stability_weights': stability_weights, 'stability_mode': stability_mode}
+    items = bound_items(box_configs)
+    footprints = list(dict.fromkeys(footprints))
+
+    shared_bounds = {}
+    bounds = {}
+    for palette_w, palette_l in footprints:
+        key = tuple(sorted((palette_w, palette_l))) if allow_rotation else (palette_w, palette_l)
+        if key not in shared_bounds:
+            shared_bounds[key] = area_bound(items, palette_w, palette_l, allow_rotation)
+        bounds[(palette_w, palette_l)] = shared_bounds[key]
+
+    results = {}
+    incumbent = -1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for footprint in sorted(footprints, key=lambda footprint: (-bounds[footprint], footprint)):
+            futures[executor.submit(_solve_footprint, (box_configs, box_label, footprint[0], footprint[1], allow_rotation, kwargs))] = footprint
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                continue
+            footprint = futures[future]
+            results[footprint] = future.result()
+            incumbent = max(incumbent, results[footprint][0])
+            # Shortcut only: these footprints are reported as pruned either way
+            for other in futures:
+                if bounds[futures[other]] < incumbent:
+                    other.cancel()
+
+    best_count = max((result[0] for result in results.values()), default=-1)
+    rows = []
+    for palette_w, palette_l in footprints:
+        footprint = (palette_w, palette_l)
+        row = {'palette_w': palette_w, 'palette_l': palette_l, 'count': None, 'utilization': None, 'algo': None, 'bound': bounds[footprint]}
+        if bounds[footprint] < best_count:
+            row['status'] = 'pruned'
+        elif results[footprint][0] == -1:
+            row['status'] = 'no_layout'
+        else:
+            count, algo, placed_area = results[footprint]
+            row.update(status='solved', count=count, algo=algo, utilization=placed_area / (palette_w * palette_l))
+        rows.append(row)
+
+    status_order = {'solved': 0, 'pruned': 1, 'no_layout': 2}
+    rows.sort(key=lambda row: (
+        status_order[row['status']], -(row['count'] or 0), -(row['utilization'] or 0),
+        row['palette_w'] * row['palette_l'], row['palette_w'], row['palette_l'],
+    ))
+    return rows
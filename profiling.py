@@ -0,0 +1,148 @@
+# profiling.py
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import hashlib
+import json
+import os
+import time
+
+# Profiling is opt-in: set this environment variable to a directory and every
+# calculation writes its profile there.
+PROFILE_DIR_ENV = "PALLET_PROFILE_DIR"
+
+_active_profiler = contextvars.ContextVar('active_profiler', default=None)
+
+
+def canonical_input(lang, box_configs, palette_w, palette_l, allow_rotation, memory_bounded, seed, stability_weights, stability_mode):
+    """Returns the calculation inputs as a plain, JSON-serializable dict."""
+    return {
+        'lang': lang,
+        'palette_w': int(palette_w),
+        'palette_l': int(palette_l),
+        'allow_rotation': bool(allow_rotation),
+        'memory_bounded': bool(memory_bounded),
+        'seed': int(seed),
+        'stability_weights': {name: float(weight) for name, weight in sorted((stability_weights or {}).items())},
+        'stability_mode': stability_mode,
+        'boxes': [
+            {'w': int(box['w']), 'l': int(box['l']), 'q': box.get('q'), 'priority': bool(box.get('priority')), 'color': box['color']}
+            for box in box_configs
+        ],
+    }
+
+
+def input_tag(canonical):
+    """Returns a short hash of the canonical input, used to name profile files."""
+    data = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:12]
+
+
+def result_summary(result):
+    """Returns the parts of a solve result worth keeping with its profile."""
+    return {'count': result['count'], 'algo': result['algo'], 'seed': result['seed'], 'fingerprint': result['fingerprint']}
+
+
+def load_record(path):
+    """Loads a .json record written by SolveProfiler.stop()."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Times a step of the solve path while a SolveProfiler is running, otherwise does nothing."""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    profiler.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.timings.append((tuple(profiler.stack), time.perf_counter() - start))
+        profiler.stack.pop()
+
+
+class SolveProfiler:
+    """Profiles one calculation with cProfile and writes the results to profile_dir.
+
+    Use it as a context manager: profiling stops when the block exits, even on
+    an exception, and the path of the .json record is left in self.capture.
+    Set self.summary inside the block to store result details with the
+    profile. Does nothing if profile_dir is None. stop() writes three files named
+    <input tag>-<timestamp>: a .prof pstats dump, a .folded file with the stage
+    timings as flamegraph collapsed stacks (in microseconds) and a .json record
+    holding the canonical input, stage timings and the replay command.
+    """
+
+    def __init__(self, canonical, profile_dir):
+        self.canonical = canonical
+        self.profile_dir = profile_dir
+        self.stack = []
+        self.timings = []
+        self.summary = None
+        self.capture = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        summary = dict(self.summary or {})
+        if exc_value is not None:
+            summary['error'] = repr(exc_value)
+        self.capture = self.stop(summary)
+        return False
+
+    def start(self):
+        if self.profile_dir is None:
+            return
+        self.stack, self.timings = [], []
+        self._token = _active_profiler.set(self)
+        self._profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self, summary=None):
+        """Stops profiling and returns the path of the .json record, or None if disabled."""
+        if self.profile_dir is None:
+            return None
+        try:
+            self._profile.disable()
+            total = time.perf_counter() - self._started
+        finally:
+            _active_profiler.reset(self._token)
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        base = os.path.join(self.profile_dir, f"{input_tag(self.canonical)}-{stamp}")
+        self._profile.dump_stats(base + ".prof")
+
+        # Stage timings include their children; the folded format wants self time
+        totals = {}
+        for path, elapsed in self.timings:
+            totals[path] = totals.get(path, 0) + elapsed
+        self_times = dict(totals)
+        self_times[()] = total
+        for path, elapsed in totals.items():
+            self_times[path[:-1]] -= elapsed
+        with open(base + ".folded", 'w', encoding='utf-8') as f:
+            for path, elapsed in self_times.items():
+                f.write(f"{';'.join(('calculation',) + path)} {max(0, round(elapsed * 1e6))}\n")
+
+        record = {
+            'tag': input_tag(self.canonical),
+            'input': self.canonical,
+            'total_seconds': total,
+            'stages': [{'stage': ";".join(path), 'seconds': elapsed} for path, elapsed in self.timings],
+            'summary': summary or {},
+            'pstats': base + ".prof",
+            'folded': base + ".folded",
+            'replay': f"python replay_profile.py {base}.json",
+        }
+        with open(base + ".json", 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+        return base + ".json"
@@ -0,0 +1,62 @@
+# replay_profile.py
+import argparse
+import io
+import os
+import pstats
+import sys
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+import packing_engine
+import profiling
+from layout_render import create_layout_figure, generate_layout_description
+from translations import TRANSLATIONS
+
+
+def run_calculation(canonical):
+    """Runs the headless part of a calculation: solve, layout description and figure rendering."""
+    t = TRANSLATIONS[canonical['lang']]
+    with profiling.stage("solve"):
+        result = packing_engine.solve(
+            canonical['boxes'], t['box_label'], canonical['palette_w'], canonical['palette_l'], canonical['allow_rotation'],
+            memory_bounded=canonical['memory_bounded'], seed=canonical['seed'],
+            stability_weights=canonical['stability_weights'], stability_mode=canonical['stability_mode']
+        )
+    if result['count'] != -1:
+        with profiling.stage("describe"):
+            generate_layout_description(result['layout'], canonical['boxes'], result['algo'], canonical['allow_rotation'], t)
+        with profiling.stage("render figure"):
+            fig = create_layout_figure(canonical['palette_w'], canonical['palette_l'], result['layout'], canonical['boxes'], t['box_label'])
+            fig.savefig(io.BytesIO(), format='png')
+            plt.close(fig)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run a profiled calculation headlessly and profile it again.")
+    parser.add_argument('capture', help="the .json record written by a profiled calculation")
+    parser.add_argument('--out', help="directory for the new profile files (default: next to the capture)")
+    parser.add_argument('--top', type=int, default=25, help="number of functions to print, by cumulative time")
+    args = parser.parse_args(argv)
+
+    matplotlib.use('Agg')
+    record = profiling.load_record(args.capture)
+    with profiling.SolveProfiler(record['input'], args.out or os.path.dirname(os.path.abspath(args.capture))) as profiler:
+        result = run_calculation(record['input'])
+        profiler.summary = profiling.result_summary(result)
+    capture = profiler.capture
+
+    old_fingerprint = record['summary'].get('fingerprint')
+    if old_fingerprint and old_fingerprint != result['fingerprint']:
+        print(f"Warning: captured with solver {old_fingerprint}, replayed with {result['fingerprint']}", file=sys.stderr)
+
+    replayed = profiling.load_record(capture)
+    pstats.Stats(replayed['pstats']).sort_stats('cumulative').print_stats(args.top)
+    print(f"Boxes: {result['count']} ({result['algo']})")
+    print(f"Profile: {replayed['pstats']}")
+    print(f"Folded stacks: {replayed['folded']}")
+
+
+if __name__ == "__main__":
+    main()
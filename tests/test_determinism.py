@@ -0,0 +1,62 @@
+import itertools
+
+import pytest
+
+import packing_engine
+
+BOX_MIXES = [
+    [{'w': 320, 'l': 420, 'q': None, 'priority': True}],
+    [{'w': 400, 'l': 400, 'q': None, 'priority': True}],
+    [{'w': 300, 'l': 200, 'q': 4, 'priority': True}, {'w': 187, 'l': 170, 'q': None, 'priority': False}],
+]
+
+
+def solve_summary(box_configs, **kwargs):
+    result = packing_engine.solve(box_configs, "Box", 1200, 800, True, **kwargs)
+    return result['count'], result['algo'], result['layout']
+
+
+@pytest.mark.parametrize("box_configs", BOX_MIXES)
+@pytest.mark.parametrize("memory_bounded", [False, True])
+def test_winner_does_not_depend_on_heuristic_order(monkeypatch, box_configs, memory_bounded):
+    expected = solve_summary(box_configs, memory_bounded=memory_bounded, seed=7)
+    for order in itertools.permutations(packing_engine.PACK_ALGOS):
+        monkeypatch.setattr(packing_engine, "PACK_ALGOS", list(order))
+        assert solve_summary(box_configs, memory_bounded=memory_bounded, seed=7) == expected
+
+
+@pytest.mark.parametrize("box_configs", BOX_MIXES)
+def test_same_seed_gives_same_result(box_configs):
+    first = packing_engine.solve(box_configs, "Box", 1200, 800, True, seed=3)
+    second = packing_engine.solve(box_configs, "Box", 1200, 800, True, seed=3)
+    assert first == second
+    assert first['seed'] == 3
+    assert first['fingerprint'] == packing_engine.solver_fingerprint()
+
+
+def test_fingerprint_changes_with_solver_version(monkeypatch):
+    before = packing_engine.solver_fingerprint()
+    monkeypatch.setattr(packing_engine, "SOLVER_VERSION", packing_engine.SOLVER_VERSION + ".1")
+    assert packing_engine.solver_fingerprint() != before
+
+
+def test_fingerprint_changes_with_max_free_rects(monkeypatch):
+    before = packing_engine.solver_fingerprint()
+    monkeypatch.setattr(packing_engine, "MAX_FREE_RECTS", packing_engine.MAX_FREE_RECTS + 1)
+    assert packing_engine.solver_fingerprint() != before
+
+
+def test_fingerprint_does_not_depend_on_heuristic_order(monkeypatch):
+    before = packing_engine.solver_fingerprint()
+    monkeypatch.setattr(packing_engine, "PACK_ALGOS", packing_engine.PACK_ALGOS[::-1])
+    assert packing_engine.solver_fingerprint() == before
+
+
+def test_fingerprint_changes_with_heuristic_set(monkeypatch):
+    before = packing_engine.solver_fingerprint()
+    monkeypatch.setattr(packing_engine, "PACK_ALGOS", packing_engine.PACK_ALGOS[1:])
+    assert packing_engine.solver_fingerprint() != before
+
+
+def test_fingerprint_is_stable():
+    assert packing_engine.solver_fingerprint() == packing_engine.solver_fingerprint()
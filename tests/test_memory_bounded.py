@@ -0,0 +1,110 @@
+import random
+import tracemalloc
+from collections import Counter
+
+import pytest
+import rectpack
+
+import packing_engine
+
+
+def test_capped_pack_algo_never_exceeds_max_free_rects():
+    rng = random.Random(0)
+    sizes = [(rng.randint(10, 60), rng.randint(10, 60)) for _ in range(300)]
+
+    uncapped = rectpack.MaxRectsBl(600, 600, rot=True)
+    capped = packing_engine.capped_pack_algo(rectpack.MaxRectsBl, 8)(600, 600, rot=True)
+    uncapped_max = 0
+    for w, h in sizes:
+        uncapped.add_rect(w, h)
+        uncapped_max = max(uncapped_max, len(uncapped._max_rects))
+        capped.add_rect(w, h)
+        assert len(capped._max_rects) <= 8
+
+    # The input must fragment enough for the cap to matter
+    assert uncapped_max > 8
+    assert len(capped) > 0
+
+
+def test_capped_pack_algo_keeps_name():
+    assert packing_engine.capped_pack_algo(rectpack.MaxRectsBssf, 8).__name__ == "MaxRectsBssf"
+    assert packing_engine.capped_pack_algo(rectpack.MaxRectsBssf, None) is rectpack.MaxRectsBssf
+
+
+def working_memory(box_configs, palette_w, palette_l):
+    """Returns (boxes placed, peak traced memory minus the memory still held by the result)."""
+    tracemalloc.start()
+    result = packing_engine.solve_memory_bounded(box_configs, "Box", palette_w, palette_l, True, 0)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result['count'], peak - current, current
+
+
+def test_memory_bounded_peak_memory_stays_flat():
+    sizes = [(1200, 800), (2400, 1200), (4800, 2400), (9600, 4800)]
+    # Ask for exactly as many 50x50 boxes as fit on each pallet
+    mixes = [[{'w': 50, 'l': 50, 'q': w * l // 2500, 'priority': True}] for w, l in sizes]
+    working_memory(mixes[0], *sizes[0])  # warm up caches and lazy imports
+
+    measurements = [working_memory(box_configs, w, l) for box_configs, (w, l) in zip(mixes, sizes)]
+    counts = [count for count, _, _ in measurements]
+
+    assert counts == [384, 1152, 4608, 18432]
+    # 48 times the boxes, but apart from one pass over the finished layout for
+    # its metrics, the memory used while solving stays within a fixed budget
+    for _, peak, result_size in measurements:
+        assert peak < result_size + 64 * 1024
+
+
+@pytest.mark.parametrize("box_configs", [
+    [{'w': 50, 'l': 50, 'q': None, 'priority': True}],
+    [{'w': 400, 'l': 300, 'q': 1, 'priority': True}, {'w': 50, 'l': 50, 'q': None, 'priority': False}],
+    [{'w': 50, 'l': 50, 'q': 300, 'priority': True}, {'w': 80, 'l': 60, 'q': 120, 'priority': False}],
+])
+def test_memory_bounded_places_the_same_boxes_as_a_normal_solve(box_configs):
+    bounded = packing_engine.solve(box_configs, "Box", 2400, 1200, True, memory_bounded=True)
+    normal = packing_engine.solve(box_configs, "Box", 2400, 1200, True)
+
+    assert Counter(rect['rid'] for rect in bounded['layout']) == Counter(rect['rid'] for rect in normal['layout'])
+
+
+def connected(layout, gap):
+    """True if every box can be reached from the first through gaps narrower than gap."""
+    seen = {0}
+    todo = [0]
+    while todo:
+        a = layout[todo.pop()]
+        for i, b in enumerate(layout):
+            if i not in seen and (
+                a['x'] - gap < b['x'] + b['w'] and b['x'] - gap < a['x'] + a['w']
+                and a['y'] - gap < b['y'] + b['h'] and b['y'] - gap < a['y'] + a['h']
+            ):
+                seen.add(i)
+                todo.append(i)
+    return len(seen) == len(layout)
+
+
+def test_memory_bounded_required_boxes_stay_one_block():
+    result = packing_engine.solve([{'w': 50, 'l': 50, 'q': 300, 'priority': True}], "Box", 2400, 1200, True, memory_bounded=True)
+    layout = result['layout']
+
+    assert result['count'] == 300
+    # No gap between boxes that another 50x50 box could fill
+    assert connected(layout, 50)
+    width = max(rect['x'] + rect['w'] for rect in layout) - min(rect['x'] for rect in layout)
+    length = max(rect['y'] + rect['h'] for rect in layout) - min(rect['y'] for rect in layout)
+    assert width * length < 2 * 300 * 50 * 50
+
+
+def test_memory_bounded_metrics_cover_the_whole_pallet():
+    box_configs = [{'w': 50, 'l': 50, 'q': 300, 'priority': True}, {'w': 80, 'l': 60, 'q': 120, 'priority': False}]
+    result = packing_engine.solve(box_configs, "Box", 2400, 1200, True, memory_bounded=True)
+    placements = [(rect['x'], rect['y'], rect['w'], rect['h'], rect['rid']) for rect in result['layout']]
+    box_dims = {"Box A": (50, 50), "Box B": (80, 60)}
+
+    assert result['algo'].split(' / Tiled ')[1] != '1x1'
+    assert result['metrics'] == pytest.approx(packing_engine.layout_metrics(placements, box_dims))
+
+
+def test_tile_order_grows_from_the_corner():
+    assert packing_engine.tile_order(3, 2) == [(0, 0), (1, 0), (0, 1), (1, 1), (2, 0), (2, 1)]
@@ -0,0 +1,72 @@
+import pytest
+
+import packing_engine
+
+BOXES = [{'w': 187, 'l': 170, 'q': None, 'priority': True}]
+
+
+def test_footprints_are_solved_in_the_orientation_given():
+    rows = packing_engine.optimize_footprint(BOXES, "Box", [(1200, 800), (800, 1200)], True, max_workers=2)
+
+    for row in rows:
+        expected = packing_engine.solve(BOXES, "Box", row['palette_w'], row['palette_l'], True)
+        assert row['count'] == expected['count']
+        assert row['algo'] == expected['algo']
+    assert rows[0]['bound'] == rows[1]['bound']
+
+
+def test_table_does_not_depend_on_worker_count():
+    footprints = packing_engine.footprint_range(800, 1200, 800, 1200, 100)
+    tables = [packing_engine.optimize_footprint(BOXES, "Box", footprints, True, max_workers=n) for n in (1, 2, 4)]
+
+    assert tables[0] == tables[1] == tables[2]
+    best = max(row['count'] for row in tables[0] if row['status'] == 'solved')
+    for row in tables[0]:
+        if row['status'] == 'pruned':
+            assert row['bound'] < best and row['count'] is None
+        else:
+            assert row['bound'] >= best
+
+
+def test_rows_are_ranked_by_count_then_utilization():
+    rows = packing_engine.optimize_footprint(BOXES, "Box", [(600, 400), (1200, 800), (1140, 1140)], True)
+    solved = [row for row in rows if row['status'] == 'solved']
+    assert solved == sorted(solved, key=lambda row: (-row['count'], -row['utilization']))
+    assert rows[-1]['status'] == 'pruned'
+
+
+def test_area_bound_is_an_upper_bound():
+    items = packing_engine.bound_items(BOXES)
+    for w, l in [(1200, 800), (800, 1200), (1140, 1140), (150, 150)]:
+        assert packing_engine.area_bound(items, w, l, True) >= packing_engine.solve(BOXES, "Box", w, l, True)['count']
+    assert packing_engine.area_bound(items, 150, 150, True) == 0
+
+
+def test_parse_footprints():
+    assert packing_engine.parse_footprints("1200x800, 800 X 1200;\n1140*1140") == [(1200, 800), (800, 1200), (1140, 1140)]
+
+
+@pytest.mark.parametrize("text", ["", " , ", "1200x", "0x800", "1200x800x10", "abc"])
+def test_parse_footprints_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        packing_engine.parse_footprints(text)
+
+
+def test_parse_footprints_rejects_too_many():
+    with pytest.raises(ValueError):
+        packing_engine.parse_footprints(",".join(["1200x800"] * (packing_engine.MAX_FOOTPRINTS + 1)))
+
+
+def test_footprint_range():
+    assert packing_engine.footprint_range(1000, 1200, 800, 800, 100) == [(1000, 800), (1100, 800), (1200, 800)]
+
+
+@pytest.mark.parametrize("args", [
+    (1200, 1000, 800, 1200, 100),  # min width above max width
+    (1000, 1200, 1200, 800, 100),  # min length above max length
+    (1000, 1200, 800, 1200, 0),
+    (1, 5000, 1, 5000, 1),  # millions of footprints
+])
+def test_footprint_range_rejects_bad_input(args):
+    with pytest.raises(ValueError):
+        packing_engine.footprint_range(*args)
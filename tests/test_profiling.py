@@ -0,0 +1,49 @@
+import pytest
+
+import profiling
+import replay_profile
+
+CANONICAL = profiling.canonical_input(
+    "En", [{'w': 320, 'l': 420, 'q': None, 'priority': True, 'color': "#FFADAD"}], 1200, 800, True, False, 0, {}, 'tie_break'
+)
+
+
+def test_profiler_is_a_no_op_without_profile_dir():
+    with profiling.SolveProfiler(CANONICAL, None) as profiler:
+        with profiling.stage("solve"):
+            pass
+    assert profiler.capture is None
+    assert profiler.timings == []
+
+
+def test_profiler_stops_when_the_block_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        with profiling.SolveProfiler(CANONICAL, str(tmp_path)) as profiler:
+            with profiling.stage("solve"):
+                raise RuntimeError("boom")
+
+    assert profiling._active_profiler.get() is None
+    record = profiling.load_record(profiler.capture)
+    assert record['summary']['error'] == "RuntimeError('boom')"
+    assert [stage['stage'] for stage in record['stages']] == ["solve"]
+
+    # A new profiler must be able to enable cProfile again
+    with profiling.SolveProfiler(CANONICAL, str(tmp_path)) as profiler:
+        pass
+    assert profiler.capture is not None
+
+
+def test_replay_writes_a_new_profile(tmp_path, capsys):
+    with profiling.SolveProfiler(CANONICAL, str(tmp_path / "captured")) as profiler:
+        profiler.summary = profiling.result_summary(replay_profile.run_calculation(CANONICAL))
+
+    replay_profile.main([profiler.capture, "--out", str(tmp_path / "replayed"), "--top", "3"])
+
+    replayed = list((tmp_path / "replayed").glob("*.json"))
+    assert len(replayed) == 1
+    record = profiling.load_record(str(replayed[0]))
+    assert record['tag'] == profiling.input_tag(CANONICAL)
+    assert record['summary']['count'] == profiling.load_record(profiler.capture)['summary']['count']
+    stages = {stage['stage'] for stage in record['stages']}
+    assert {"solve", "solve;build rectangles", "solve;center layout", "describe", "render figure"} <= stages
+    assert "Boxes:" in capsys.readouterr().out
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+import packing_engine
+
+
+def metrics(placements, box_dims):
+    return packing_engine.layout_metrics(placements, box_dims)
+
+
+def test_grid_of_one_size():
+    placements = [(0, 0, 100, 50, "A"), (100, 0, 100, 50, "A"), (0, 50, 100, 50, "A"), (100, 50, 100, 50, "A")]
+    result = metrics(placements, {"A": (100, 50)})
+
+    assert result['bbox_area'] == 20000
+    assert result['rotated'] == 0
+    assert result['interlock'] == 0
+    assert result['column_stacking'] == 1
+    assert result['edge_support'] == 1
+    assert result['center_of_gravity'] == pytest.approx(1)
+
+
+def test_pinwheel():
+    # Four 200x100 boxes around a 100x100 hole, alternating orientation
+    placements = [
+        (0, 0, 200, 100, "A"), (200, 0, 100, 200, "A"),
+        (100, 200, 200, 100, "A"), (0, 100, 100, 200, "A"),
+    ]
+    result = metrics(placements, {"A": (200, 100)})
+
+    assert result['rotated'] == 2
+    assert result['interlock'] == 1
+    assert result['column_stacking'] == 0
+    assert result['edge_support'] == 1
+    assert result['center_of_gravity'] == pytest.approx(1)
+
+
+def test_l_shape():
+    placements = [(0, 0, 100, 100, "A"), (100, 0, 100, 100, "A"), (0, 100, 100, 100, "A")]
+    result = metrics(placements, {"A": (100, 100)})
+
+    assert result['column_stacking'] == pytest.approx(2 / 3)
+    assert result['edge_support'] == pytest.approx(600 / 800)
+    # Centre of mass at (83.3, 83.3), a sixth of the half diagonal from the middle
+    assert result['center_of_gravity'] == pytest.approx(5 / 6)
+
+
+def test_interlock_is_zero_for_square_boxes():
+    placements = [(0, 0, 100, 100, "A"), (100, 0, 100, 100, "A")]
+    assert metrics(placements, {"A": (100, 100)})['interlock'] == 0
+
+
+def test_edge_support_is_capped_for_overlapping_placements():
+    placements = [(0, 0, 100, 100, "A"), (0, 0, 100, 100, "A")]
+    assert metrics(placements, {"A": (100, 100)})['edge_support'] == 1
+
+
+def test_empty_layout():
+    result = metrics([], {})
+    assert all(result[name] == 0 for name in packing_engine.STABILITY_METRICS)
+
+
+ROW_OF_FIVE = [(x * 100, 0, 100, 100, "A") for x in range(5)]
+GRID_OF_FOUR = [(0, 0, 100, 100, "A"), (100, 0, 100, 100, "A"), (0, 100, 100, 100, "A"), (100, 100, 100, 100, "A")]
+
+
+def winner(weight, stability_mode):
+    box_dims = {"A": (100, 100)}
+    keys = {
+        name: packing_engine.ranking_key(placements, box_dims, random.Random(0), {'column_stacking': weight}, stability_mode)[0]
+        for name, placements in [("row", ROW_OF_FIVE), ("grid", GRID_OF_FOUR)]
+    }
+    return max(keys, key=keys.get)
+
+
+@pytest.mark.parametrize("weight, expected", [(0.5, "row"), (1.0, "row"), (1.5, "grid")])
+def test_objective_trades_a_box_only_for_weight_above_one(weight, expected):
+    assert metrics(ROW_OF_FIVE, {"A": (100, 100)})['column_stacking'] == 0
+    assert metrics(GRID_OF_FOUR, {"A": (100, 100)})['column_stacking'] == 1
+    assert winner(weight, 'objective') == expected
+
+
+@pytest.mark.parametrize("weight", [0.5, 1.0, 1.5, 10.0])
+def test_tie_break_never_trades_a_box(weight):
+    assert winner(weight, 'tie_break') == "row"
@@ -0,0 +1,220 @@
+# translations.py
+# --- Internationalization (i18n) Setup ---
+TRANSLATIONS = {
+    "En": {
+        "title": "Advanced Pallet Loading Calculator",
+        "subtitle": "Using the Maximal Rectangles algorithm to find the best layout.",
+        "palette_dims": "Palette Dimensions (mm)",
+        "palette_w": "Palette Width",
+        "palette_l": "Palette Length",
+        "allow_rotation": "Allow box rotation",
+        "memory_bounded": "Memory-bounded mode",
+        "memory_bounded_help": "For large quantities of small boxes. Uses less memory by filling the pallet one tile at a time; asks for the same boxes as a normal calculation, but can fit slightly fewer.",
+        "seed": "Seed",
+        "solver_info": "Solver {fingerprint}, seed {seed}",
+        "profile_saved": "Profile saved: {path}",
+        "optimizer_header": "Pallet Size Optimizer",
+        "candidates": "Candidate footprints",
+        "candidates_list": "List",
+        "candidates_range": "Range",
+        "footprints": "Footprints (mm)",
+        "footprints_help": "One W x L per line, e.g. 1200x800",
+        "width_min": "Min Width",
+        "width_max": "Max Width",
+        "length_min": "Min Length",
+        "length_max": "Max Length",
+        "step": "Step (mm)",
+        "optimize": "Find Best Pallet Size",
+        "optimizer_spinner": "Evaluating pallet sizes...",
+        "optimizer_results": "Pallet Size Ranking",
+        "error_footprints": "Could not read the pallet footprints: {error}",
+        "footprint": "Pallet (W x L)",
+        "utilization": "Utilization",
+        "bound": "Upper Bound",
+        "status": "Status",
+        "status_solved": "Solved",
+        "status_pruned": "Skipped (cannot win)",
+        "status_no_layout": "No valid layout",
+        "stability_header": "Load Stability",
+        "stability_mode": "Use stability as",
+        "tie_break": "Tie-breaker",
+        "objective": "Weighted objective",
+        "stability_weight": "Weight: {metric}",
+        "interlock": "Interlocking",
+        "column_stacking": "Column stacking",
+        "edge_support": "Edge support",
+        "center_of_gravity": "Centre of gravity",
+        "box_types": "Box Types",
+        "box_label": "Box",
+        "top_priority": "Top Priority",
+        "width_mm": "Width (mm)",
+        "length_mm": "Length (mm)",
+        "req_qty": "Required Quantity",
+        "unlimited": "Unlimited",
+        "clear": "X",
+        "color": "Color",
+        "remove": "🗑️ Remove",
+        "add_box": "Add New Box Type",
+        "calculate": "Calculate Best Layout",
+        "spinner": "Running heuristic tournament...",
+        "results": "Results",
+        "warn_duplicate": "Warning: Box {box1} has the same dimensions as Box {box2}. Results may be ambiguous.",
+        "error_priority": "Could not find any layout that satisfies all TOP PRIORITY required quantities.",
+        "warn_required": "Could not fit all required boxes. Only packed {packed} of {required} for {label}.",
+        "success_packed": "Successfully packed all required boxes.",
+        "desc_header": "Layout Description",
+        "visual_header": "Visual Layout",
+        "winning_heuristic": "Winning Heuristic",
+        "total_boxes": "Total Boxes",
+        "breakdown_header": "Box Breakdown",
+        "standard": "Standard",
+        "rotated": "Rotated",
+        "placement_header": "Placement List (X, Y are top-left corners)",
+        "position": "Position",
+        "size": "Size",
+    },
+    "繁": {
+        "title": "高級棧板裝載計算機",
+        "subtitle": "使用最大矩形算法尋找最佳佈局。",
+        "palette_dims": "棧板尺寸 (mm)",
+        "palette_w": "棧板寬度",
+        "palette_l": "棧板長度",
+        "allow_rotation": "允許箱子旋轉",
+        "memory_bounded": "記憶體限制模式",
+        "memory_bounded_help": "適用於大量小箱子。逐個區塊填滿棧板以節省記憶體；要求的箱子與一般計算相同，但可能裝入略少。",
+        "seed": "隨機種子",
+        "solver_info": "求解器 {fingerprint}，種子 {seed}",
+        "profile_saved": "效能分析已儲存：{path}",
+        "optimizer_header": "棧板尺寸優化",
+        "candidates": "候選棧板尺寸",
+        "candidates_list": "清單",
+        "candidates_range": "範圍",
+        "footprints": "棧板尺寸 (mm)",
+        "footprints_help": "每行一個 寬x長，例如 1200x800",
+        "width_min": "最小寬度",
+        "width_max": "最大寬度",
+        "length_min": "最小長度",
+        "length_max": "最大長度",
+        "step": "間距 (mm)",
+        "optimize": "尋找最佳棧板尺寸",
+        "optimizer_spinner": "正在評估棧板尺寸...",
+        "optimizer_results": "棧板尺寸排名",
+        "error_footprints": "無法讀取棧板尺寸：{error}",
+        "footprint": "棧板 (寬 x 長)",
+        "utilization": "使用率",
+        "bound": "上限",
+        "status": "狀態",
+        "status_solved": "已計算",
+        "status_pruned": "已略過（無法勝出）",
+        "status_no_layout": "無有效佈局",
+        "stability_header": "載重穩定性",
+        "stability_mode": "穩定性用途",
+        "tie_break": "平手判定",
+        "objective": "加權目標",
+        "stability_weight": "權重：{metric}",
+        "interlock": "互鎖",
+        "column_stacking": "柱狀堆疊",
+        "edge_support": "邊緣支撐",
+        "center_of_gravity": "重心",
+        "box_types": "箱子類型",
+        "box_label": "箱子",
+        "top_priority": "最優先",
+        "width_mm": "寬度 (mm)",
+        "length_mm": "長度 (mm)",
+        "req_qty": "要求數量",
+        "unlimited": "無限",
+        "clear": "X",
+        "color": "顏色",
+        "remove": "🗑️ 移除",
+        "add_box": "新增箱子類型",
+        "calculate": "計算最佳佈局",
+        "spinner": "正在運行啟發式算法競賽...",
+        "results": "結果",
+        "warn_duplicate": "警告：{box1} 與 {box2} 尺寸相同。結果可能不明確。",
+        "error_priority": "無法找到滿足所有最優先要求的佈局。",
+        "warn_required": "無法裝入所有要求的箱子。對於 {label}，{required} 個中只裝入了 {packed} 個。",
+        "success_packed": "成功裝入所有要求的箱子。",
+        "desc_header": "佈局說明",
+        "visual_header": "視覺化佈局",
+        "winning_heuristic": "最佳啟發式算法",
+        "total_boxes": "總箱數",
+        "breakdown_header": "箱子細目",
+        "standard": "標準",
+        "rotated": "旋轉",
+        "placement_header": "放置清單 (X, Y 為左上角座標)",
+        "position": "位置",
+        "size": "尺寸",
+    },
+    "簡": {
+        "title": "高级托盘装载计算器",
+        "subtitle": "使用最大矩形算法寻找最佳布局。",
+        "palette_dims": "托盘尺寸 (mm)",
+        "palette_w": "托盘宽度",
+        "palette_l": "托盘长度",
+        "allow_rotation": "允许箱子旋转",
+        "memory_bounded": "内存限制模式",
+        "memory_bounded_help": "适用于大量小箱子。逐个区块填满托盘以节省内存；要求的箱子与一般计算相同，但可能装入略少。",
+        "seed": "随机种子",
+        "solver_info": "求解器 {fingerprint}，种子 {seed}",
+        "profile_saved": "性能分析已保存：{path}",
+        "optimizer_header": "托盘尺寸优化",
+        "candidates": "候选托盘尺寸",
+        "candidates_list": "清单",
+        "candidates_range": "范围",
+        "footprints": "托盘尺寸 (mm)",
+        "footprints_help": "每行一个 宽x长，例如 1200x800",
+        "width_min": "最小宽度",
+        "width_max": "最大宽度",
+        "length_min": "最小长度",
+        "length_max": "最大长度",
+        "step": "间距 (mm)",
+        "optimize": "寻找最佳托盘尺寸",
+        "optimizer_spinner": "正在评估托盘尺寸...",
+        "optimizer_results": "托盘尺寸排名",
+        "error_footprints": "无法读取托盘尺寸：{error}",
+        "footprint": "托盘 (宽 x 长)",
+        "utilization": "利用率",
+        "bound": "上限",
+        "status": "状态",
+        "status_solved": "已计算",
+        "status_pruned": "已跳过（无法胜出）",
+        "status_no_layout": "无有效布局",
+        "stability_header": "载重稳定性",
+        "stability_mode": "稳定性用途",
+        "tie_break": "平手判定",
+        "objective": "加权目标",
+        "stability_weight": "权重：{metric}",
+        "interlock": "互锁",
+        "column_stacking": "柱状堆叠",
+        "edge_support": "边缘支撑",
+        "center_of_gravity": "重心",
+        "box_types": "箱子类型",
+        "box_label": "箱子",
+        "top_priority": "最优先",
+        "width_mm": "宽度 (mm)",
+        "length_mm": "长度 (mm)",
+        "req_qty": "要求数量",
+        "unlimited": "无限",
+        "clear": "X",
+        "color": "颜色",
+        "remove": "🗑️ 移除",
+        "add_box": "新增箱子类型",
+        "calculate": "计算最佳布局",
+        "spinner": "正在运行启发式算法竞赛...",
+        "results": "结果",
+        "warn_duplicate": "警告：{box1} 与 {box2} 尺寸相同。结果可能不明确。",
+        "error_priority": "无法找到满足所有最优先要求的布局。",
+        "warn_required": "无法装入所有要求的箱子。对于 {label}，{required} 个中只装入了 {packed} 个。",
+        "success_packed": "成功装入所有要求的箱子。",
+        "desc_header": "布局说明",
+        "visual_header": "可视化布局",
+        "winning_heuristic": "最佳启发式算法",
+        "total_boxes": "总箱数",
+        "breakdown_header": "箱子细目",
+        "standard": "标准",
+        "rotated": "旋转",
+        "placement_header": "放置清单 (X, Y 为左上角坐标)",
+        "position": "位置",
+        "size": "尺寸",
+    },
+}